@@ -10,6 +10,11 @@ import json
 import logging
 from typing import Dict, List, Any, Optional
 
+try:
+    import orjson
+except ImportError:  # 未安装时使用requests自带的JSON解析
+    orjson = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -17,20 +22,28 @@ logger = logging.getLogger(__name__)
 class APIClient:
     """API客户端类"""
     
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(self, base_url: str = "http://localhost:8080", session: Optional[requests.Session] = None):
         """
         初始化API客户端
         
         Args:
             base_url: API服务器基础URL
+            session: 共享的HTTP会话（可选），多个客户端可复用同一连接池
         """
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
+        self.session = session if session is not None else requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
     
+    @staticmethod
+    def _parse_json(response: requests.Response) -> Any:
+        """解析JSON响应"""
+        if orjson is not None:
+            return orjson.loads(response.content)
+        return response.json()
+    
     def get_data(self, filename: str, item_type: str = None) -> Dict[str, Any]:
         """
         获取数据
@@ -49,8 +62,8 @@ class APIClient:
         try:
             response = self.session.get(f"{self.base_url}/api/data", params=params)
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"获取数据失败: {e}")
             return {}
     
@@ -69,8 +82,8 @@ class APIClient:
         try:
             response = self.session.get(f"{self.base_url}/api/data/{filename}/{item_type}/{item_id}")
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"获取项目失败: {e}")
             return None
     
@@ -95,9 +108,9 @@ class APIClient:
         try:
             response = self.session.post(f"{self.base_url}/api/data", json=data)
             response.raise_for_status()
-            result = response.json()
+            result = self._parse_json(response)
             return result.get('success', False)
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"添加项目失败: {e}")
             return False
     
@@ -117,9 +130,9 @@ class APIClient:
         try:
             response = self.session.post(f"{self.base_url}/api/data/{filename}/{item_type}/{item_id}", json=update_data)
             response.raise_for_status()
-            result = response.json()
+            result = self._parse_json(response)
             return result.get('success', False)
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"更新项目失败: {e}")
             return False
     
@@ -138,9 +151,9 @@ class APIClient:
         try:
             response = self.session.delete(f"{self.base_url}/api/data/{filename}/{item_type}/{item_id}")
             response.raise_for_status()
-            result = response.json()
+            result = self._parse_json(response)
             return result.get('success', False)
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"删除项目失败: {e}")
             return False
     
@@ -157,8 +170,8 @@ class APIClient:
         try:
             response = self.session.get(f"{self.base_url}/api/stats", params={'file': filename})
             response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
+            return self._parse_json(response)
+        except (requests.exceptions.RequestException, ValueError) as e:
             logger.error(f"获取统计信息失败: {e}")
             return {}
     
@@ -8,11 +8,24 @@
 
 import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Any
+from functools import lru_cache
 import logging
 
+try:
+    import zstandard
+except ImportError:  # 未安装时仅支持未压缩的JSON文件
+    zstandard = None
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装时批量搜索逐个匹配搜索词
+    ahocorasick = None
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -24,42 +37,98 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=256)
+def _compile_term(term: str) -> re.Pattern:
+    """编译搜索词（忽略大小写），重复搜索同一词时复用"""
+    return re.compile(re.escape(term), re.IGNORECASE)
+
 class DataManager:
     """数据管理器基类"""
     
     def __init__(self, data_file: str):
         self.data_file = data_file
+        # 以 .zst 结尾的数据文件使用zstd压缩存储
+        self.compressed: bool = data_file.endswith('.zst')
         self.data = []
+        # 数据是否有未保存的修改，以及最近一次写入文件的序列化内容
+        self._dirty: bool = True
+        self._last_serialized: Optional[bytes] = None
+        # 按 (字段, 值) 缓存的过滤结果，数据变更时清空
+        self._view_cache: Dict[tuple, List] = {}
         self.load_data()
     
     def load_data(self):
         """从JSON文件加载数据"""
         try:
             if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
+                if self.compressed:
+                    self.data = json.loads(self._read_compressed())
+                else:
+                    with open(self.data_file, 'r', encoding='utf-8') as f:
+                        self.data = json.load(f)
+                self._dirty = False
                 logger.info(f"从 {self.data_file} 加载了 {len(self.data)} 条数据")
             else:
                 self.data = []
+                self._dirty = True
                 logger.info(f"数据文件 {self.data_file} 不存在，创建空数据列表")
         except Exception as e:
             logger.error(f"加载数据失败: {e}")
             self.data = []
+        
+        self._view_cache.clear()
+        
+        # 下一个可用ID，创建数据时递增，避免每次扫描全部数据
+        self._next_id = max((item.get('id', 0) for item in self.data), default=0) + 1
     
     def save_data(self):
         """保存数据到JSON文件"""
+        if not self._dirty:
+            return True
+        
         try:
+            if self.compressed:
+                payload = json.dumps(self.data, ensure_ascii=False).encode('utf-8')
+            else:
+                payload = json.dumps(self.data, ensure_ascii=False, indent=2).encode('utf-8')
+            
+            # 内容与上次写入一致时跳过写文件
+            if payload == self._last_serialized:
+                self._dirty = False
+                return True
+            
             # 确保目录存在
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
             
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            if self.compressed:
+                self._write_compressed(payload)
+            else:
+                with open(self.data_file, 'wb') as f:
+                    f.write(payload)
+            self._last_serialized = payload
+            self._dirty = False
             logger.info(f"数据已保存到 {self.data_file}")
             return True
         except Exception as e:
             logger.error(f"保存数据失败: {e}")
             return False
     
+    def _read_compressed(self) -> bytes:
+        """读取并解压zstd数据文件"""
+        if zstandard is None:
+            raise RuntimeError("读取 .zst 数据文件需要安装 zstandard")
+        with open(self.data_file, 'rb') as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+    
+    def _write_compressed(self, payload: bytes):
+        """压缩写入数据文件，先写临时文件再替换，避免写入中断损坏原文件"""
+        if zstandard is None:
+            raise RuntimeError("写入 .zst 数据文件需要安装 zstandard")
+        tmp_file = self.data_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            f.write(zstandard.ZstdCompressor(level=3).compress(payload))
+        os.replace(tmp_file, self.data_file)
+    
     def get_all(self) -> List[Dict]:
         """获取所有数据"""
         return self.data
@@ -75,7 +144,8 @@ class DataManager:
         """创建新数据"""
         try:
             # 生成新ID
-            new_id = max([item.get('id', 0) for item in self.data], default=0) + 1
+            new_id = self._next_id
+            self._next_id += 1
             
             # 添加创建时间和ID
             item_data['id'] = new_id
@@ -83,6 +153,8 @@ class DataManager:
             item_data['updateTime'] = item_data['createTime']
             
             self.data.append(item_data)
+            self._dirty = True
+            self._view_cache.clear()
             
             if self.save_data():
                 logger.info(f"创建数据成功，ID: {new_id}")
@@ -102,16 +174,21 @@ class DataManager:
                 logger.warning(f"未找到ID为 {item_id} 的数据")
                 return None
             
-            # 更新数据
-            for key, value in update_data.items():
-                if key != 'id':  # 不允许修改ID
-                    item[key] = value
+            # 只保留实际发生变化的字段（不允许修改ID）
+            patch = {key: value for key, value in update_data.items()
+                     if key != 'id' and item.get(key) != value}
+            if not patch:
+                logger.info(f"数据无变化，跳过保存，ID: {item_id}")
+                return item
             
-            # 更新时间
+            # 更新数据和更新时间
+            item.update(patch)
             item['updateTime'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            self._dirty = True
+            self._view_cache.clear()
             
             if self.save_data():
-                logger.info(f"更新数据成功，ID: {item_id}")
+                logger.info(f"更新数据成功，ID: {item_id}，变更字段: {list(patch)}")
                 return item
             else:
                 logger.error("保存数据失败")
@@ -129,6 +206,8 @@ class DataManager:
                 return False
             
             self.data = [item for item in self.data if item.get('id') != item_id]
+            self._dirty = True
+            self._view_cache.clear()
             
             if self.save_data():
                 logger.info(f"删除数据成功，ID: {item_id}")
@@ -140,23 +219,84 @@ class DataManager:
             logger.error(f"删除数据失败: {e}")
             return False
     
+    def filter_by(self, field: str, value: Any) -> List[Dict]:
+        """获取指定字段等于某值的数据，结果缓存到下次数据变更"""
+        key = (field, value)
+        try:
+            view = self._view_cache.get(key)
+        except TypeError:
+            # 不可哈希的值（如列表、字典）无法作为缓存键，直接计算不缓存
+            return [item for item in self.data if item.get(field) == value]
+        if view is None:
+            view = [item for item in self.data if item.get(field) == value]
+            self._view_cache[key] = view
+        return list(view)
+    
     def search(self, search_term: str, fields: List[str]) -> List[Dict]:
         """搜索数据"""
         try:
-            search_term = search_term.lower()
+            term = search_term.lower()
             results = []
+            append = results.append
             
             for item in self.data:
                 for field in fields:
-                    if field in item and str(item[field]).lower().find(search_term) != -1:
-                        results.append(item)
+                    value = item.get(field)
+                    if value is None:
+                        continue
+                    if not isinstance(value, str):
+                        value = str(value)
+                    if term in value.lower():
+                        append(item)
                         break
             
-            logger.info(f"搜索 '{search_term}' 找到 {len(results)} 条结果")
+            logger.info(f"搜索 '{term}' 找到 {len(results)} 条结果")
             return results
         except Exception as e:
             logger.error(f"搜索数据失败: {e}")
             return []
+    
+    def search_many(self, search_terms: List[str], fields: List[str]) -> Dict[str, List[Dict]]:
+        """批量搜索数据，一次遍历返回每个搜索词的匹配结果"""
+        terms = [term for term in dict.fromkeys(search_terms) if term]
+        results = {term: [] for term in terms}
+        if not terms or not fields:
+            return results
+        
+        try:
+            if ahocorasick is not None:
+                # 仅大小写不同的搜索词共用同一个小写键，命中时全部计入结果
+                groups = {}
+                for term in terms:
+                    groups.setdefault(term.lower(), []).append(term)
+                automaton = ahocorasick.Automaton()
+                for key, group in groups.items():
+                    automaton.add_word(key, tuple(group))
+                automaton.make_automaton()
+                
+                def match_terms(text):
+                    return {term for _, group in automaton.iter(text) for term in group}
+            else:
+                patterns = [(term, _compile_term(term)) for term in terms]
+                
+                def match_terms(text):
+                    return {term for term, pattern in patterns if pattern.search(text)}
+            
+            for item in self.data:
+                matched = set()
+                for field in fields:
+                    value = item.get(field)
+                    if value is None:
+                        continue
+                    matched |= match_terms(str(value).lower())
+                for term in matched:
+                    results[term].append(item)
+            
+            logger.info(f"批量搜索 {len(terms)} 个词，共匹配 {sum(len(v) for v in results.values())} 条结果")
+            return results
+        except Exception as e:
+            logger.error(f"批量搜索数据失败: {e}")
+            return {term: [] for term in terms}
 
 class ThemeManager(DataManager):
     """主题管理器"""
@@ -198,7 +338,7 @@ class ThemeManager(DataManager):
     
     def get_active_themes(self) -> List[Dict]:
         """获取启用的主题"""
-        return [theme for theme in self.data if theme.get('status') == 'active']
+        return self.filter_by('status', 'active')
 
 class DataStandardManager(DataManager):
     """数据标准管理器"""
@@ -252,11 +392,11 @@ class DataStandardManager(DataManager):
     
     def get_standards_by_type(self, standard_type: str) -> List[Dict]:
         """根据类型获取数据标准"""
-        return [standard for standard in self.data if standard.get('type') == standard_type]
+        return self.filter_by('type', standard_type)
     
     def get_active_standards(self) -> List[Dict]:
         """获取启用的数据标准"""
-        return [standard for standard in self.data if standard.get('status') == 'active']
+        return self.filter_by('status', 'active')
 
 class DataSpecificationManager(DataManager):
     """数据规范管理器"""
@@ -310,21 +450,25 @@ class DataSpecificationManager(DataManager):
     
     def get_specifications_by_type(self, spec_type: str) -> List[Dict]:
         """根据类型获取数据规范"""
-        return [spec for spec in self.data if spec.get('type') == spec_type]
+        return self.filter_by('type', spec_type)
     
     def get_specifications_by_domain(self, business_domain: str) -> List[Dict]:
         """根据业务域获取数据规范"""
-        return [spec for spec in self.data if spec.get('businessDomain') == business_domain]
+        return self.filter_by('businessDomain', business_domain)
 
 def main():
     """主函数 - 演示CRUD操作"""
     print("数据仓库数据模型管理系统 - CRUD操作演示")
     print("=" * 50)
     
-    # 初始化管理器
-    theme_manager = ThemeManager()
-    standard_manager = DataStandardManager()
-    spec_manager = DataSpecificationManager()
+    # 初始化管理器（各自读取独立的数据文件，并行加载）
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        theme_future = executor.submit(ThemeManager)
+        standard_future = executor.submit(DataStandardManager)
+        spec_future = executor.submit(DataSpecificationManager)
+        theme_manager = theme_future.result()
+        standard_manager = standard_future.result()
+        spec_manager = spec_future.result()
     
     # 演示主题管理
     print("\n1. 主题管理演示")
@@ -8,14 +8,29 @@
 import json
 import os
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+from functools import wraps
+from typing import Dict, List, Any, Optional, Tuple, Iterator, Set
 from datetime import datetime
 import uuid
 
+try:
+    import ijson
+except ImportError:  # 未安装时总是完整解析JSON文件
+    ijson = None
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _synchronized(method):
+    """写操作加锁，多线程共享同一实例时保证读-改-写过程不被打断"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class DataHandler:
     """数据处理器类"""
     
@@ -31,6 +46,12 @@ class DataHandler:
             self.config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
         else:
             self.config_dir = config_dir
+        # 已解析数据缓存: filename -> {'signature': (mtime_ns, size), 'data': 数据, 'stats': 计数}
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        # 已流式读取过的文件，之后的读取都经load_json_data解析并填充缓存
+        self._streamed: Set[str] = set()
+        # 写操作锁，可重入以便写操作之间相互调用
+        self._lock = threading.RLock()
         self.ensure_config_dir()
     
     def ensure_config_dir(self):
@@ -53,10 +74,20 @@ class DataHandler:
         
         try:
             if os.path.exists(filepath):
+                signature = self._file_signature(filepath)
+                cached = self._cache.get(filename)
+                if cached is not None and cached['signature'] == signature:
+                    return cached['data']
+                
                 with open(filepath, 'r', encoding='utf-8') as f:
                     data = json.load(f)
                     logger.info(f"成功加载JSON文件: {filename}")
-                    return data
+                self._cache[filename] = {
+                    'signature': signature,
+                    'data': data,
+                    'stats': self._count_items(data)
+                }
+                return data
             else:
                 logger.warning(f"JSON文件不存在: {filename}")
                 return {}
@@ -67,6 +98,50 @@ class DataHandler:
             logger.error(f"加载JSON文件失败 {filename}: {e}")
             return {}
     
+    def _stream_once(self, filename: str) -> bool:
+        """安装了ijson且该文件从未读取过时返回True，表示本次应流式解析；每个文件只流式解析一次"""
+        if ijson is None or filename in self._cache or filename in self._streamed:
+            return False
+        self._streamed.add(filename)
+        return True
+    
+    def _load_item_type(self, filename: str, item_type: str) -> Iterator[Dict[str, Any]]:
+        """
+        逐个读取指定类型的项目
+        
+        首次冷读取且安装了ijson时只流式解析该类型的数组，不解析整个文件；
+        之后经load_json_data读取并填充缓存。值不是数组时没有可遍历的项目。
+        需要修改数据时仍应使用load_json_data。
+        """
+        if self._stream_once(filename):
+            return self._stream_item_type(os.path.join(self.config_dir, filename), filename, item_type)
+        
+        value = self.load_json_data(filename).get(item_type, [])
+        return iter(value) if isinstance(value, list) else iter(())
+    
+    @staticmethod
+    def _stream_item_type(filepath: str, filename: str, item_type: str) -> Iterator[Dict[str, Any]]:
+        """使用ijson流式解析指定类型的数组，文件不存在时没有项目，解析错误直接抛出"""
+        try:
+            f = open(filepath, 'rb')
+        except FileNotFoundError:
+            logger.warning(f"JSON文件不存在: {filename}")
+            return
+        with f:
+            yield from ijson.items(f, f"{item_type}.item", use_float=True)
+    
+    @staticmethod
+    def _stream_item_value(filepath: str, filename: str, item_type: str) -> Any:
+        """使用ijson只解析指定键的值，值可以是任意类型；文件不存在时返回空列表，解析错误直接抛出"""
+        try:
+            f = open(filepath, 'rb')
+        except FileNotFoundError:
+            logger.warning(f"JSON文件不存在: {filename}")
+            return []
+        with f:
+            return next(ijson.items(f, item_type, use_float=True), [])
+    
+    @_synchronized
     def save_json_data(self, filename: str, data: Dict[str, Any]) -> bool:
         """
         保存数据到JSON文件
@@ -78,6 +153,10 @@ class DataHandler:
         Returns:
             保存是否成功
         """
+        return self._save_json_data(filename, data)
+    
+    def _save_json_data(self, filename: str, data: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> bool:
+        """保存数据并刷新缓存，stats为None时重新统计各类型项目数"""
         filepath = os.path.join(self.config_dir, filename)
         
         try:
@@ -88,12 +167,48 @@ class DataHandler:
             with open(filepath, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             
+            if isinstance(data, dict):
+                self._cache[filename] = {
+                    'signature': self._file_signature(filepath),
+                    'data': data,
+                    'stats': stats if stats is not None else self._count_items(data)
+                }
+            else:
+                self._cache.pop(filename, None)
+            
             logger.info(f"成功保存JSON文件: {filename}")
             return True
         except Exception as e:
+            # 缓存中的数据可能已被修改，丢弃后下次重新加载
+            self._cache.pop(filename, None)
             logger.error(f"保存JSON文件失败 {filename}: {e}")
             return False
     
+    @staticmethod
+    def _file_signature(filepath: str) -> Tuple[int, int]:
+        """文件签名(修改时间, 大小)，用于判断缓存是否失效"""
+        st = os.stat(filepath)
+        return st.st_mtime_ns, st.st_size
+    
+    @staticmethod
+    def _count_items(data: Dict[str, Any]) -> Dict[str, Any]:
+        """统计各类型项目数"""
+        if not isinstance(data, dict):
+            return {'counts': {}, 'total': 0}
+        counts = {key: len(value) for key, value in data.items()
+                  if key != 'last_updated' and isinstance(value, list)}
+        return {'counts': counts, 'total': sum(counts.values())}
+    
+    def _adjust_stats(self, filename: str, data: Dict[str, Any], item_type: str, delta: int) -> Optional[Dict[str, Any]]:
+        """在缓存计数上增量调整某类型项目数，无可用缓存时返回None"""
+        cached = self._cache.get(filename)
+        if cached is None or cached['data'] is not data:
+            return None
+        counts = dict(cached['stats']['counts'])
+        counts[item_type] = counts.get(item_type, 0) + delta
+        return {'counts': counts, 'total': cached['stats']['total'] + delta}
+    
+    @_synchronized
     def add_item(self, filename: str, item_type: str, item_data: Dict[str, Any]) -> bool:
         """
         添加新项目到JSON文件
@@ -120,8 +235,10 @@ class DataHandler:
         
         data[item_type].append(item_data)
         
-        return self.save_json_data(filename, data)
+        stats = self._adjust_stats(filename, data, item_type, 1)
+        return self._save_json_data(filename, data, stats)
     
+    @_synchronized
     def update_item(self, filename: str, item_type: str, item_id: str, update_data: Dict[str, Any]) -> bool:
         """
         更新JSON文件中的项目
@@ -152,6 +269,7 @@ class DataHandler:
         logger.error(f"未找到ID为 {item_id} 的项目")
         return False
     
+    @_synchronized
     def delete_item(self, filename: str, item_type: str, item_id: str) -> bool:
         """
         从JSON文件中删除项目
@@ -174,9 +292,11 @@ class DataHandler:
         original_length = len(data[item_type])
         data[item_type] = [item for item in data[item_type] if item.get('id') != item_id]
         
-        if len(data[item_type]) < original_length:
+        removed = original_length - len(data[item_type])
+        if removed > 0:
             logger.info(f"成功删除项目: {item_id}")
-            return self.save_json_data(filename, data)
+            stats = self._adjust_stats(filename, data, item_type, -removed)
+            return self._save_json_data(filename, data, stats)
         else:
             logger.error(f"未找到ID为 {item_id} 的项目")
             return False
@@ -193,12 +313,7 @@ class DataHandler:
         Returns:
             项目数据或None
         """
-        data = self.load_json_data(filename)
-        
-        if item_type not in data:
-            return None
-        
-        for item in data[item_type]:
+        for item in self._load_item_type(filename, item_type):
             if item.get('id') == item_id:
                 return item
         
@@ -215,6 +330,9 @@ class DataHandler:
         Returns:
             项目列表
         """
+        if self._stream_once(filename):
+            return self._stream_item_value(os.path.join(self.config_dir, filename), filename, item_type)
+        
         data = self.load_json_data(filename)
         return data.get(item_type, [])
     
@@ -231,8 +349,9 @@ class DataHandler:
         Returns:
             匹配的项目列表
         """
-        items = self.list_items(filename, item_type)
-        return [item for item in items if search_value.lower() in str(item.get(search_key, '')).lower()]
+        search_value = search_value.lower()
+        return [item for item in self._load_item_type(filename, item_type)
+                if search_value in str(item.get(search_key, '')).lower()]
     
     def get_file_stats(self, filename: str) -> Dict[str, Any]:
         """
@@ -245,19 +364,18 @@ class DataHandler:
             统计信息
         """
         data = self.load_json_data(filename)
-        stats = {
+        cached = self._cache.get(filename)
+        if cached is not None and cached['data'] is data:
+            counts = cached['stats']
+        else:
+            counts = self._count_items(data)
+        
+        return {
             'filename': filename,
             'last_updated': data.get('last_updated', 'Unknown'),
-            'total_items': 0,
-            'item_types': {}
+            'total_items': counts['total'],
+            'item_types': dict(counts['counts'])
         }
-        
-        for key, value in data.items():
-            if key != 'last_updated' and isinstance(value, list):
-                stats['item_types'][key] = len(value)
-                stats['total_items'] += len(value)
-        
-        return stats
 
 # 创建全局数据处理器实例
 data_handler = DataHandler()
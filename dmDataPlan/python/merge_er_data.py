@@ -6,67 +6,101 @@ O线ER关系数据合并脚本
 """
 
 import json
+import logging
 import os
 import sys
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
 
-def load_json_file(file_path: str) -> Optional[Dict]:
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库json
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # 未安装时完整加载后再过滤
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, os.PathLike]
+
+# 配置文件目录及合并所用的文件路径，模块加载时计算一次
+CONFIG_DIR = Path(__file__).resolve().parent.parent / 'config'
+CONFIG_PATHS = {key: CONFIG_DIR / name for key, name in {
+    'selected_tables': 'selected_tables.json',
+    'relations': 'o_line_relations.json',
+    'table_metadata': 'table_metadata.json',
+    'output': 'merged_er_data.json',
+}.items()}
+
+def load_json_file(file_path: PathLike) -> Optional[Dict]:
     """加载JSON文件"""
     try:
-        if not os.path.exists(file_path):
-            print(f"警告: 文件不存在 {file_path}")
-            return None
-            
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            print(f"成功加载文件: {file_path}")
-            return data
+        # 一次性读取全部字节再解析，避免文本解码层的多次小块读取
+        with open(file_path, 'rb', buffering=65536) as f:
+            raw = f.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        logger.info("成功加载文件: %s", file_path)
+        return data
+    except FileNotFoundError:
+        logger.warning("文件不存在 %s", file_path)
+        return None
     except Exception as e:
-        print(f"加载文件失败 {file_path}: {e}")
+        logger.error("加载文件失败 %s: %s", file_path, e)
         return None
 
-def get_table_from_selected_tables(table_name: str, selected_tables_data: Dict) -> Optional[Dict]:
-    """从selected_tables.json中获取表的完整信息（包含完整字段信息）"""
-    if not selected_tables_data or 'tables' not in selected_tables_data:
+def load_tables_streaming(file_path: PathLike, wanted: set) -> Optional[List[Dict]]:
+    """流式读取JSON文件中的tables数组，只保留表名在wanted中的表"""
+    if ijson is None:
+        data = load_json_file(file_path)
+        if data is None:
+            return None
+        tables = data.get('tables', []) if isinstance(data, dict) else []
+        return [table for table in tables if table.get('name') in wanted]
+    
+    try:
+        with open(file_path, 'rb') as f:
+            tables = [table for table in ijson.items(f, 'tables.item', use_float=True)
+                      if table.get('name') in wanted]
+        logger.info("成功加载文件: %s", file_path)
+        return tables
+    except FileNotFoundError:
+        logger.warning("文件不存在 %s", file_path)
         return None
-        
-    for table in selected_tables_data['tables']:
-        if table.get('name') == table_name:
-            return table
-    return None
-
-def get_table_metadata(table_name: str, table_metadata: Dict) -> Optional[Dict]:
-    """从table_metadata中获取表的完整信息"""
-    if not table_metadata or 'tables' not in table_metadata:
+    except Exception as e:
+        logger.error("加载文件失败 %s: %s", file_path, e)
         return None
-        
-    for table in table_metadata['tables']:
-        if table.get('name') == table_name:
-            return table
-    return None
 
-def merge_er_data(selected_tables_path: str, relations_path: str, table_metadata_path: str, output_path: str) -> bool:
+def index_tables_by_name(tables: List[Dict]) -> Dict[str, Dict]:
+    """按表名建立表信息索引，同名表保留第一个"""
+    tables_by_name = {}
+    for table in tables:
+        tables_by_name.setdefault(table.get('name'), table)
+    return tables_by_name
+
+def merge_er_data(selected_tables_path: PathLike, relations_path: PathLike, table_metadata_path: PathLike, output_path: PathLike) -> bool:
     """合并ER数据"""
+    return merge_er_payload(selected_tables_path, relations_path, table_metadata_path, output_path) is not None
+
+def merge_er_payload(selected_tables_path: PathLike, relations_path: PathLike, table_metadata_path: PathLike, output_path: PathLike) -> Optional[bytes]:
+    """合并ER数据并写入输出文件，返回写入的JSON字节，调用方可直接复用而无需重新读取文件；失败返回None"""
     try:
-        print("开始合并ER数据...")
+        logger.info("开始合并ER数据...")
         
         # 加载数据文件
         selected_tables_data = load_json_file(selected_tables_path)
         relations_data = load_json_file(relations_path)
-        table_metadata = load_json_file(table_metadata_path)
         
         if not selected_tables_data:
-            print("错误: 无法加载selected_tables.json")
-            return False
+            logger.error("无法加载selected_tables.json")
+            return None
             
         if not relations_data:
-            print("错误: 无法加载o_line_relations.json")
-            return False
-            
-        if not table_metadata:
-            print("错误: 无法加载table_metadata.json")
-            return False
+            logger.error("无法加载o_line_relations.json")
+            return None
         
         # 获取已选表名列表
         selected_table_names = []
@@ -82,8 +116,12 @@ def merge_er_data(selected_tables_path: str, relations_path: str, table_metadata
             elif 'selectedTables' in last_item:
                 selected_table_names = last_item['selectedTables']
         
-        print(f"已选表数量: {len(selected_table_names)}")
-        print(f"已选表列表: {selected_table_names}")
+        # 去重并保持原有顺序，避免重复处理同一张表
+        selected_table_names = list(dict.fromkeys(selected_table_names))
+        wanted = set(selected_table_names)
+        
+        logger.info("已选表数量: %d", len(selected_table_names))
+        logger.debug("已选表列表: %s", selected_table_names)
         
         # 获取关系数据
         relations = []
@@ -92,32 +130,48 @@ def merge_er_data(selected_tables_path: str, relations_path: str, table_metadata
         elif isinstance(relations_data, list):
             relations = relations_data
         
-        print(f"关系数量: {len(relations)}")
+        logger.info("关系数量: %d", len(relations))
+        
+        # table_metadata.json只读取已选表
+        metadata_tables = load_tables_streaming(table_metadata_path, wanted)
+        if metadata_tables is None:
+            logger.error("无法加载table_metadata.json")
+            return None
+        
+        # 按表名建立索引，避免对每个已选表线性查找
+        selected_tables = selected_tables_data.get('tables', []) if isinstance(selected_tables_data, dict) else []
+        selected_by_name = index_tables_by_name(selected_tables)
+        meta_by_name = index_tables_by_name(metadata_tables)
         
-        # 构建合并后的表信息
-        merged_tables = []
-        for table_name in selected_table_names:
-            # 优先从selected_tables.json中获取表信息（包含完整字段信息）
-            table_info = get_table_from_selected_tables(table_name, selected_tables_data)
-            if table_info:
-                merged_tables.append(table_info)
-                print(f"从selected_tables.json找到表信息: {table_name}")
+        # 先按来源划分表名：优先selected_tables.json（包含完整字段信息），其次table_metadata.json
+        in_selected = wanted & selected_by_name.keys()
+        in_meta = (wanted - in_selected) & meta_by_name.keys()
+        missing = [name for name in selected_table_names if name not in in_selected and name not in in_meta]
+        found_selected = len(in_selected)
+        found_meta = len(in_meta)
+        
+        # 按已选顺序构建合并后的表信息（预先分配列表长度）
+        merged_tables = [None] * len(selected_table_names)
+        for i, table_name in enumerate(selected_table_names):
+            if table_name in in_selected:
+                merged_tables[i] = selected_by_name[table_name]
+                logger.debug("从selected_tables.json找到表信息: %s", table_name)
+            elif table_name in in_meta:
+                merged_tables[i] = meta_by_name[table_name]
+                logger.debug("从table_metadata.json找到表信息: %s", table_name)
             else:
-                # 如果selected_tables.json中没有，尝试从table_metadata.json获取
-                table_info = get_table_metadata(table_name, table_metadata)
-                if table_info:
-                    merged_tables.append(table_info)
-                    print(f"从table_metadata.json找到表信息: {table_name}")
-                else:
-                    print(f"警告: 未找到表信息 {table_name}")
-                    # 创建一个基本的表信息
-                    basic_table_info = {
-                        "name": table_name,
-                        "type": "unknown",
-                        "description": f"表 {table_name}",
-                        "fields": []
-                    }
-                    merged_tables.append(basic_table_info)
+                # 未找到时创建一个基本的表信息
+                merged_tables[i] = {
+                    "name": table_name,
+                    "type": "unknown",
+                    "description": f"表 {table_name}",
+                    "fields": []
+                }
+        
+        logger.info("表信息来源: selected_tables.json %d 个, table_metadata.json %d 个, 未找到 %d 个",
+                    found_selected, found_meta, len(missing))
+        if missing:
+            logger.warning("未找到表信息 %s", missing)
         
         # 构建合并后的数据
         merged_data = {
@@ -126,52 +180,58 @@ def merge_er_data(selected_tables_path: str, relations_path: str, table_metadata
             "tables": merged_tables,
             "relations": relations,
             "textBoxes": [],
-            "collapseStates": {},
+            # 所有表默认折叠
+            "collapseStates": {table['name']: True for table in merged_tables if table.get('name')},
             "metadata": {
                 "mergeTime": datetime.now().isoformat(),
                 "selectedTablesCount": len(selected_table_names),
                 "relationsCount": len(relations),
                 "sourceFiles": {
-                    "selectedTables": selected_tables_path,
-                    "relations": relations_path,
-                    "tableMetadata": table_metadata_path
+                    "selectedTables": os.fspath(selected_tables_path),
+                    "relations": os.fspath(relations_path),
+                    "tableMetadata": os.fspath(table_metadata_path)
                 }
             }
         }
         
-        # 初始化折叠状态
-        for table in merged_tables:
-            table_name = table.get('name', '')
-            if table_name:
-                merged_data['collapseStates'][table_name] = True
-        
-        # 保存合并后的数据
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(merged_data, f, ensure_ascii=False, indent=2)
+        # 保存合并后的数据：先整体序列化，再一次写入文件
+        if orjson is not None:
+            payload = orjson.dumps(merged_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            payload = json.dumps(merged_data, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.write(payload)
         
-        print(f"数据合并完成，保存到: {output_path}")
-        print(f"合并结果:")
-        print(f"  - 表数量: {len(merged_tables)}")
-        print(f"  - 关系数量: {len(relations)}")
-        print(f"  - 合并时间: {merged_data['metadata']['mergeTime']}")
+        logger.info("数据合并完成，保存到: %s", output_path)
+        logger.info("合并结果:")
+        logger.info("  - 表数量: %d", len(merged_tables))
+        logger.info("  - 关系数量: %d", len(relations))
+        logger.info("  - 合并时间: %s", merged_data['metadata']['mergeTime'])
         
-        return True
+        return payload
         
     except Exception as e:
-        print(f"合并数据失败: {e}")
-        return False
+        logger.error("合并数据失败: %s", e)
+        return None
 
 def main():
     """主函数"""
-    # 获取脚本所在目录
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # 仅命令行运行时需要argparse，被web_server等模块导入时不加载
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='O线ER关系数据合并脚本')
+    parser.add_argument('--verbose', action='store_true', help='输出每张表的信息来源')
+    args = parser.parse_args()
+    
+    # 诊断信息输出到stdout，--verbose时额外输出每张表的信息来源
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format='%(message)s', stream=sys.stdout)
     
     # 配置文件路径
-    config_dir = os.path.join(os.path.dirname(script_dir), 'config')
-    selected_tables_path = os.path.join(config_dir, 'selected_tables.json')
-    relations_path = os.path.join(config_dir, 'o_line_relations.json')
-    table_metadata_path = os.path.join(config_dir, 'table_metadata.json')
-    output_path = os.path.join(config_dir, 'merged_er_data.json')
+    selected_tables_path = CONFIG_PATHS['selected_tables']
+    relations_path = CONFIG_PATHS['relations']
+    table_metadata_path = CONFIG_PATHS['table_metadata']
+    output_path = CONFIG_PATHS['output']
     
     print("O线ER关系数据合并脚本")
     print("=" * 50)
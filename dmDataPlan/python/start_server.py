@@ -6,17 +6,54 @@
 
 import sys
 import os
-import argparse
+from types import SimpleNamespace
 from web_server import start_server
 
+# 命令行选项: 选项名 -> (属性名, 类型转换, 默认值)
+OPTIONS = {
+    '--host': ('host', str, 'localhost'),
+    '--port': ('port', int, 8080),
+    '--config-dir': ('config_dir', str, '../config'),
+}
+
+USAGE = """用法: start_server.py [--host HOST] [--port PORT] [--config-dir CONFIG_DIR]
+
+启动数据交互Web服务器
+
+选项:
+  --host HOST              服务器主机地址 (默认: localhost)
+  --port PORT              服务器端口 (默认: 8080)
+  --config-dir CONFIG_DIR  配置文件目录 (默认: ../config)"""
+
+def parse_args(argv):
+    """解析命令行参数，支持 --name value 与 --name=value 两种写法"""
+    values = {attr: default for attr, _, default in OPTIONS.values()}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ('-h', '--help'):
+            print(USAGE)
+            sys.exit(0)
+        name, sep, value = arg.partition('=')
+        if name not in OPTIONS:
+            print(USAGE, file=sys.stderr)
+            sys.exit(f"未知参数: {arg}")
+        if not sep:
+            i += 1
+            if i >= len(argv):
+                sys.exit(f"参数 {name} 缺少取值")
+            value = argv[i]
+        attr, convert, _ = OPTIONS[name]
+        try:
+            values[attr] = convert(value)
+        except ValueError:
+            sys.exit(f"参数 {name} 的取值无效: {value}")
+        i += 1
+    return SimpleNamespace(**values)
+
 def main():
     """主函数"""
-    parser = argparse.ArgumentParser(description='启动数据交互Web服务器')
-    parser.add_argument('--host', default='localhost', help='服务器主机地址 (默认: localhost)')
-    parser.add_argument('--port', type=int, default=8080, help='服务器端口 (默认: 8080)')
-    parser.add_argument('--config-dir', default='../config', help='配置文件目录 (默认: ../config)')
-    
-    args = parser.parse_args()
+    args = parse_args(sys.argv[1:])
     
     # 切换到脚本所在目录
     script_dir = os.path.dirname(os.path.abspath(__file__))
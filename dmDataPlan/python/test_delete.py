@@ -5,13 +5,29 @@
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
 
+try:
+    import orjson
+except ImportError:  # 未安装时使用requests自带的JSON解析
+    orjson = None
+
+def parse_json(response):
+    """解析JSON响应"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 def test_delete_function():
     """测试删除功能"""
     base_url = "http://localhost:8080"
     
+    # 复用同一连接完成所有请求
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    
     print("=" * 50)
     print("测试删除功能")
     print("=" * 50)
@@ -19,9 +35,9 @@ def test_delete_function():
     # 1. 获取当前数据
     print("1. 获取当前应用数据...")
     try:
-        response = requests.get(f"{base_url}/api/data?file=app_management.json&type=applications")
+        response = session.get(f"{base_url}/api/data?file=app_management.json&type=applications")
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             print(f"   当前有 {len(data)} 个应用:")
             for app in data:
                 print(f"   - ID: {app.get('id')}, 名称: {app.get('name')}")
@@ -43,9 +59,9 @@ def test_delete_function():
     
     print(f"\n2. 删除应用: {app_name} (ID: {app_id})")
     try:
-        response = requests.delete(f"{base_url}/api/data/app_management.json/applications/{app_id}")
+        response = session.delete(f"{base_url}/api/data/app_management.json/applications/{app_id}")
         if response.status_code == 200:
-            result = response.json()
+            result = parse_json(response)
             if result.get('success'):
                 print("   ✓ 删除成功")
             else:
@@ -60,18 +76,25 @@ def test_delete_function():
     
     # 3. 验证删除结果
     print("\n3. 验证删除结果...")
-    time.sleep(1)  # 等待1秒
     try:
-        response = requests.get(f"{base_url}/api/data?file=app_management.json&type=applications")
+        # 轮询直到删除生效，最多等待约0.5秒
+        for _ in range(25):
+            response = session.get(f"{base_url}/api/data?file=app_management.json&type=applications")
+            if response.status_code != 200:
+                break
+            new_data = parse_json(response)
+            remaining_ids = {app.get('id') for app in new_data}
+            if app_id not in remaining_ids:
+                break
+            time.sleep(0.02)
+        
         if response.status_code == 200:
-            new_data = response.json()
             print(f"   删除后还有 {len(new_data)} 个应用:")
             for app in new_data:
                 print(f"   - ID: {app.get('id')}, 名称: {app.get('name')}")
             
             # 检查删除的应用是否还在
-            deleted_app_exists = any(app.get('id') == app_id for app in new_data)
-            if deleted_app_exists:
+            if app_id in remaining_ids:
                 print("   ✗ 删除失败：应用仍然存在")
             else:
                 print("   ✓ 删除成功：应用已不存在")
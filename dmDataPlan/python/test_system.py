@@ -7,8 +7,22 @@
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from data_handler import DataHandler
 
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库json
+    orjson = None
+
+@lru_cache(maxsize=64)
+def _load(path, mtime):
+    """读取并解析JSON文件，按(路径, 修改时间)缓存，文件未变化时不重复解析"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 def test_data_handler():
     """测试数据处理器"""
     print("=" * 50)
@@ -52,6 +66,29 @@ def test_data_handler():
     
     print("数据处理器测试完成！")
 
+def _check_one(filepath):
+    """检查单个JSON文件，返回要输出的结果行"""
+    lines = [f"检查文件: {os.path.basename(filepath)}"]
+    
+    try:
+        data = _load(filepath, os.path.getmtime(filepath))
+        lines.append(f"  ✓ JSON格式正确")
+        lines.append(f"  ✓ 包含 {len(data)} 个顶级键")
+        
+        # 检查数据结构
+        for key, value in data.items():
+            if isinstance(value, list):
+                lines.append(f"  ✓ {key}: {len(value)} 个项目")
+            else:
+                lines.append(f"  ✓ {key}: {type(value).__name__}")
+                
+    except json.JSONDecodeError as e:
+        lines.append(f"  ✗ JSON格式错误: {e}")
+    except Exception as e:
+        lines.append(f"  ✗ 读取文件失败: {e}")
+    
+    return lines
+
 def test_json_files():
     """测试JSON文件格式"""
     print("\n" + "=" * 50)
@@ -61,27 +98,13 @@ def test_json_files():
     config_dir = "../config"
     json_files = [f for f in os.listdir(config_dir) if f.endswith('.json')]
     
-    for filename in json_files:
-        filepath = os.path.join(config_dir, filename)
-        print(f"检查文件: {filename}")
-        
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                print(f"  ✓ JSON格式正确")
-                print(f"  ✓ 包含 {len(data)} 个顶级键")
-                
-                # 检查数据结构
-                for key, value in data.items():
-                    if isinstance(value, list):
-                        print(f"  ✓ {key}: {len(value)} 个项目")
-                    else:
-                        print(f"  ✓ {key}: {type(value).__name__}")
-                        
-        except json.JSONDecodeError as e:
-            print(f"  ✗ JSON格式错误: {e}")
-        except Exception as e:
-            print(f"  ✗ 读取文件失败: {e}")
+    # 并行检查各文件，按原顺序输出结果
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(json_files)))) as executor:
+        results = list(executor.map(_check_one, (os.path.join(config_dir, f) for f in json_files)))
+    
+    for lines in results:
+        for line in lines:
+            print(line)
     
     print("JSON文件测试完成！")
 
@@ -92,9 +115,12 @@ def test_api_endpoints():
     print("=" * 50)
     
     try:
+        import requests
         from api_client import APIClient
         
-        client = APIClient()
+        # 所有请求共用一个会话，复用连接
+        session = requests.Session()
+        client = APIClient(session=session)
         
         # 测试获取数据
         print("1. 测试获取数据...")
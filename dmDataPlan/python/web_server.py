@@ -5,49 +5,279 @@ Web服务器模块
 提供HTTP API接口用于HTML页面与JSON数据的交互
 """
 
+import gzip
+import hashlib
+import io
 import json
 import os
+import re
 import logging
 import mimetypes
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
-import cgi
+import stat
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl
 from data_handler import DataHandler
+from merge_er_data import CONFIG_PATHS as MERGE_PATHS, logger as merge_logger, merge_er_payload
+
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库json
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 未安装时只支持gzip压缩
+    brotli = None
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 静态页面目录与配置文件目录，模块加载时计算一次
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTML_DIR = os.path.join(BASE_DIR, 'html')
+CONFIG_DIR = os.path.join(BASE_DIR, 'config')
+
+# 未安装orjson时复用的标准库编解码器，避免每次调用都重新构造
+_json_decode = json.JSONDecoder().decode
+_json_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+_json_encode_pretty = json.JSONEncoder(ensure_ascii=False, indent=2).encode
+
+def json_loads(raw: bytes):
+    """解析JSON字节数据"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return _json_decode(raw.decode('utf-8-sig'))
+
+def json_dumps(data, pretty: bool = False) -> bytes:
+    """将数据序列化为UTF-8 JSON字节数据，pretty为True时带缩进"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(data, option=option)
+    return (_json_encode_pretty if pretty else _json_encode)(data).encode('utf-8')
+
+def _link_tmpfile(directory: str, path: str, payload: bytes) -> Optional[str]:
+    """写入O_TMPFILE匿名临时文件并落盘，再链接到目录中，返回链接路径；平台或文件系统不支持时返回None"""
+    try:
+        fd = os.open(directory, os.O_TMPFILE | os.O_WRONLY, 0o644)
+    except OSError:
+        return None
+    
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(fd, 'wb', closefd=False) as f:
+            f.write(payload)
+        os.fdatasync(fd)
+        os.link(f'/proc/self/fd/{fd}', tmp_path)
+    except OSError:
+        # 部分文件系统不允许通过/proc链接匿名文件，改用普通临时文件
+        return None
+    finally:
+        os.close(fd)
+    return tmp_path
+
+def _write_named_tmpfile(directory: str, payload: bytes) -> str:
+    """写入同目录下的普通临时文件并落盘，返回临时文件路径"""
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as f:
+        try:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.chmod(f.name, 0o644)
+    return f.name
+
+def atomic_write(path: str, payload: bytes) -> None:
+    """原子写文件：先写入同目录下的临时文件并落盘，再替换目标文件，写到一半失败不会损坏原文件"""
+    directory = os.path.dirname(path)
+    tmp_path = _link_tmpfile(directory, path, payload) if hasattr(os, 'O_TMPFILE') else None
+    if tmp_path is None:
+        tmp_path = _write_named_tmpfile(directory, payload)
+    
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+
+# 文件读取线程池，常驻复用，避免每次读取都创建线程
+IO_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix='file-io')
+
+def _warm_file(full_path: str) -> None:
+    """读取单个文件到缓存"""
+    try:
+        st = stat_regular_file(full_path)
+        if st is not None:
+            get_cached_file(full_path, st)
+    except OSError as e:
+        logger.warning(f"预读文件失败 {full_path}: {e}")
+
+def warm_file_cache(*directories: str) -> None:
+    """在IO线程池中后台预读目录下的文件到缓存，首批请求无需等待磁盘读取"""
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                IO_POOL.submit(_warm_file, os.path.join(root, name))
+
+# 合并任务写同一个输出文件，同一时间只允许一个合并在执行
+_MERGE_LOCK = threading.Lock()
+
+def run_merge() -> Tuple[Optional[bytes], str]:
+    """在当前进程内合并ER数据，返回(合并结果JSON字节, 合并过程输出)，失败时结果为None"""
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    with _MERGE_LOCK:
+        merge_logger.addHandler(handler)
+        try:
+            payload = merge_er_payload(MERGE_PATHS['selected_tables'], MERGE_PATHS['relations'],
+                                       MERGE_PATHS['table_metadata'], MERGE_PATHS['output'])
+        finally:
+            merge_logger.removeHandler(handler)
+    return payload, stream.getvalue()
+
+# 项目路径: /api/data/filename/type[/id]
+PATH_RE = re.compile(r'^/api/data/(?P<file>[^/]+)/(?P<type>[^/]+)(?:/(?P<id>[^/]+))?/?$')
+
+# JSON响应头模板，依次填入协议版本、日期、Content-Length和额外的响应头
+JSON_RESPONSE_HEAD = (
+    b'%s 200 OK\r\n'
+    b'Date: %s\r\n'
+    b'Content-Type: application/json; charset=utf-8\r\n'
+    b'Content-Length: %d\r\n'
+    b'%s'
+    b'Access-Control-Allow-Origin: *\r\n'
+    b'Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n'
+    b'Access-Control-Allow-Headers: Content-Type\r\n'
+    b'\r\n'
+)
+
+# 小于该大小的响应体压缩收益不大，不做压缩
+COMPRESS_MIN_SIZE = 1024
+
+# 除text/*外需要压缩的MIME类型，图片等已压缩格式不再压缩
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+})
+
+@lru_cache(maxsize=64)
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """根据Accept-Encoding选择压缩方式，优先br，其次gzip，客户端都不接受时返回None"""
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q='):
+            try:
+                if float(params[2:]) == 0:
+                    continue  # q=0表示明确拒绝
+            except ValueError:
+                pass
+        accepted.add(coding.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """按指定方式压缩响应体，使用较低压缩级别以减少CPU开销"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=1)
+
+def is_compressible(mime_type: str) -> bool:
+    """判断该MIME类型的内容是否值得压缩"""
+    return mime_type.startswith('text/') or mime_type in COMPRESSIBLE_TYPES
+
+# 不小于该大小的文件不缓存内容，直接由内核从文件发送到socket
+SENDFILE_THRESHOLD = 64 * 1024
+
+# 静态文件与配置文件缓存: 绝对路径 -> (修改时间ns, 文件大小, 内容, MIME类型, ETag)
+# 大文件的内容为None
+_FILE_CACHE: Dict[str, Tuple[int, int, Optional[bytes], str, str]] = {}
+
+# 文件压缩结果缓存: (绝对路径, 压缩方式) -> (原文件ETag, 压缩后内容)
+_COMPRESSED_CACHE: Dict[Tuple[str, str], Tuple[str, bytes]] = {}
+
+@lru_cache(maxsize=512)
+def guess_mime_type(ext: str) -> str:
+    """按扩展名获取MIME类型，结果缓存，无法识别时返回application/octet-stream"""
+    return mimetypes.guess_type('file' + ext)[0] or 'application/octet-stream'
+
+def stat_regular_file(full_path: str) -> Optional[os.stat_result]:
+    """获取普通文件的stat信息，文件不存在或不是普通文件时返回None"""
+    try:
+        st = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+def get_cached_file(full_path: str, st: os.stat_result) -> Tuple[int, Optional[bytes], str, str]:
+    """按修改时间和大小校验缓存，返回(文件大小, 内容, MIME类型, ETag)，大文件内容为None"""
+    entry = _FILE_CACHE.get(full_path)
+    if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[1:]
+    
+    mime_type = guess_mime_type(os.path.splitext(full_path)[1].lower())
+    if st.st_size >= SENDFILE_THRESHOLD:
+        # 大文件不读入内存，ETag由修改时间和大小生成
+        content = None
+        etag = '"%x-%x"' % (st.st_mtime_ns, st.st_size)
+    else:
+        with open(full_path, 'rb') as f:
+            content = f.read()
+        etag = '"%s"' % hashlib.blake2b(content, digest_size=8).hexdigest()
+    _FILE_CACHE[full_path] = (st.st_mtime_ns, st.st_size, content, mime_type, etag)
+    return st.st_size, content, mime_type, etag
+
+def get_compressed_file(full_path: str, etag: str, content: Optional[bytes], encoding: str) -> bytes:
+    """返回文件的压缩内容，按原文件ETag校验缓存，文件未变化时不重复压缩"""
+    key = (full_path, encoding)
+    entry = _COMPRESSED_CACHE.get(key)
+    if entry is not None and entry[0] == etag:
+        return entry[1]
+    
+    if content is None:
+        with open(full_path, 'rb') as f:
+            content = f.read()
+    compressed = compress_body(content, encoding)
+    _COMPRESSED_CACHE[key] = (etag, compressed)
+    return compressed
+
 class WebAPIHandler(BaseHTTPRequestHandler):
     """Web API处理器"""
     
-    def __init__(self, *args, **kwargs):
-        self.data_handler = DataHandler()
-        super().__init__(*args, **kwargs)
+    # 使用HTTP/1.1以支持keep-alive，所有响应都必须带Content-Length
+    protocol_version = 'HTTP/1.1'
+    
+    # 所有请求共享的数据处理器，由start_server在启动时创建
+    data_handler: DataHandler = None
     
     def do_GET(self):
         """处理GET请求"""
         parsed_path = urlparse(self.path)
         path = parsed_path.path
-        query_params = parse_qs(parsed_path.query)
+        query_params = dict(parse_qsl(parsed_path.query))
         
         try:
-            if path == '/api/data':
-                self.handle_get_data(query_params)
-            elif path == '/api/stats':
-                self.handle_get_stats(query_params)
-            elif path.startswith('/api/data/'):
-                self.handle_get_specific_data(path, query_params)
-            elif path.startswith('/html/'):
-                self.handle_static_file(path)
-            elif path.startswith('/config/'):
-                self.handle_config_file(path)
-            elif path == '/api/load-table-info':
-                self.handle_load_table_info()
-            elif path == '/api/load-relation':
-                self.handle_load_relation()
-            elif path == '/api/merge-er-data':
-                self.handle_merge_er_data()
+            handler = self._GET_ROUTES.get(path)
+            if handler is not None:
+                handler(self, query_params)
+                return
+            
+            handler = self._match_prefix(self._GET_PREFIX_ROUTES, path)
+            if handler is not None:
+                handler(self, path, query_params)
             else:
                 self.send_error(404, "Not Found")
         except Exception as e:
@@ -60,16 +290,14 @@ class WebAPIHandler(BaseHTTPRequestHandler):
         path = parsed_path.path
         
         try:
-            if path == '/api/data':
-                self.handle_post_data()
-            elif path.startswith('/api/data/'):
-                self.handle_post_specific_data(path)
-            elif path == '/api/save-table-info':
-                self.handle_save_table_info()
-            elif path == '/api/save-relation':
-                self.handle_save_relation()
-            elif path == '/api/save-selected-tables':
-                self.handle_save_selected_tables()
+            handler = self._POST_ROUTES.get(path)
+            if handler is not None:
+                handler(self)
+                return
+            
+            handler = self._match_prefix(self._POST_PREFIX_ROUTES, path)
+            if handler is not None:
+                handler(self, path)
             else:
                 self.send_error(404, "Not Found")
         except Exception as e:
@@ -80,21 +308,28 @@ class WebAPIHandler(BaseHTTPRequestHandler):
         """处理DELETE请求"""
         parsed_path = urlparse(self.path)
         path = parsed_path.path
-        query_params = parse_qs(parsed_path.query)
+        query_params = dict(parse_qsl(parsed_path.query))
         
         try:
-            if path.startswith('/api/data/'):
-                self.handle_delete_data(path, query_params)
+            handler = self._match_prefix(self._DELETE_PREFIX_ROUTES, path)
+            if handler is not None:
+                handler(self, path, query_params)
             else:
                 self.send_error(404, "Not Found")
         except Exception as e:
             logger.error(f"DELETE请求处理错误: {e}")
             self.send_error(500, f"Internal Server Error: {str(e)}")
     
+    @classmethod
+    def _match_prefix(cls, routes, path):
+        """按路径前缀查找处理函数，未匹配返回None"""
+        match = cls._PREFIX_RE.match(path)
+        return routes.get(match.group()) if match else None
+    
     def handle_get_data(self, query_params):
         """处理获取数据请求"""
-        filename = query_params.get('file', [''])[0]
-        item_type = query_params.get('type', [''])[0]
+        filename = query_params.get('file', '')
+        item_type = query_params.get('type', '')
         
         if not filename:
             self.send_error(400, "Missing file parameter")
@@ -112,14 +347,12 @@ class WebAPIHandler(BaseHTTPRequestHandler):
     def handle_get_specific_data(self, path, query_params):
         """处理获取特定数据请求"""
         # 解析路径: /api/data/filename/type/id
-        path_parts = path.split('/')
-        if len(path_parts) < 5:
+        match = PATH_RE.match(path)
+        if not match:
             self.send_error(400, "Invalid path format")
             return
         
-        filename = path_parts[3]
-        item_type = path_parts[4]
-        item_id = path_parts[5] if len(path_parts) > 5 else None
+        filename, item_type, item_id = match.group('file', 'type', 'id')
         
         if item_id:
             # 获取特定项目
@@ -135,7 +368,7 @@ class WebAPIHandler(BaseHTTPRequestHandler):
     
     def handle_get_stats(self, query_params):
         """处理获取统计信息请求"""
-        filename = query_params.get('file', [''])[0]
+        filename = query_params.get('file', '')
         
         if not filename:
             self.send_error(400, "Missing file parameter")
@@ -150,7 +383,7 @@ class WebAPIHandler(BaseHTTPRequestHandler):
         post_data = self.rfile.read(content_length)
         
         try:
-            data = json.loads(post_data.decode('utf-8'))
+            data = json_loads(post_data)
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON data")
             return
@@ -173,20 +406,18 @@ class WebAPIHandler(BaseHTTPRequestHandler):
     def handle_post_specific_data(self, path):
         """处理更新数据请求"""
         # 解析路径: /api/data/filename/type/id
-        path_parts = path.split('/')
-        if len(path_parts) < 6:
+        match = PATH_RE.match(path)
+        if not match or match.group('id') is None:
             self.send_error(400, "Invalid path format")
             return
         
-        filename = path_parts[3]
-        item_type = path_parts[4]
-        item_id = path_parts[5]
+        filename, item_type, item_id = match.group('file', 'type', 'id')
         
         content_length = int(self.headers['Content-Length'])
         post_data = self.rfile.read(content_length)
         
         try:
-            update_data = json.loads(post_data.decode('utf-8'))
+            update_data = json_loads(post_data)
         except json.JSONDecodeError:
             self.send_error(400, "Invalid JSON data")
             return
@@ -201,14 +432,12 @@ class WebAPIHandler(BaseHTTPRequestHandler):
     def handle_delete_data(self, path, query_params):
         """处理删除数据请求"""
         # 解析路径: /api/data/filename/type/id
-        path_parts = path.split('/')
-        if len(path_parts) < 6:
+        match = PATH_RE.match(path)
+        if not match or match.group('id') is None:
             self.send_error(400, "Invalid path format")
             return
         
-        filename = path_parts[3]
-        item_type = path_parts[4]
-        item_id = path_parts[5]
+        filename, item_type, item_id = match.group('file', 'type', 'id')
         
         success = self.data_handler.delete_item(filename, item_type, item_id)
         
@@ -217,80 +446,101 @@ class WebAPIHandler(BaseHTTPRequestHandler):
         else:
             self.send_error(500, "Failed to delete item")
     
-    def handle_static_file(self, path):
+    def handle_static_file(self, path, query_params=None):
         """处理静态文件请求"""
         # 移除 /html/ 前缀
         file_path = path[6:]  # 移除 '/html/'
         
         # 构建完整文件路径
-        html_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'html')
-        full_path = os.path.join(html_dir, file_path)
+        full_path = os.path.abspath(os.path.join(HTML_DIR, file_path))
         
         # 安全检查：确保文件在html目录内
-        if not os.path.abspath(full_path).startswith(os.path.abspath(html_dir)):
+        if not full_path.startswith(HTML_DIR + os.sep):
             self.send_error(403, "Forbidden")
             return
         
-        if os.path.exists(full_path) and os.path.isfile(full_path):
-            # 获取MIME类型
-            mime_type, _ = mimetypes.guess_type(full_path)
-            if mime_type is None:
-                mime_type = 'application/octet-stream'
-            
-            # 读取文件内容
-            try:
-                with open(full_path, 'rb') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-Type', mime_type)
-                self.send_header('Content-Length', str(len(content)))
-                self.end_headers()
-                self.wfile.write(content)
-                
-            except Exception as e:
-                logger.error(f"读取文件失败 {full_path}: {e}")
-                self.send_error(500, "Internal Server Error")
-        else:
+        st = stat_regular_file(full_path)
+        if st is None:
             self.send_error(404, "File Not Found")
+            return
+        
+        try:
+            self.send_file(full_path, st)
+        except Exception as e:
+            logger.error(f"读取文件失败 {full_path}: {e}")
+            self.send_error(500, "Internal Server Error")
     
-    def handle_config_file(self, path):
+    def handle_config_file(self, path, query_params=None):
         """处理配置文件请求"""
         # 移除 /config/ 前缀
         file_path = path[8:]  # 移除 '/config/'
         
         # 构建完整文件路径
-        config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-        full_path = os.path.join(config_dir, file_path)
+        full_path = os.path.abspath(os.path.join(CONFIG_DIR, file_path))
         
         # 安全检查：确保文件在config目录内
-        if not os.path.abspath(full_path).startswith(os.path.abspath(config_dir)):
+        if not full_path.startswith(CONFIG_DIR + os.sep):
             self.send_error(403, "Forbidden")
             return
         
-        if os.path.exists(full_path) and os.path.isfile(full_path):
-            # 获取MIME类型
-            mime_type, _ = mimetypes.guess_type(full_path)
-            if mime_type is None:
-                mime_type = 'application/octet-stream'
-            
-            # 读取文件内容
-            try:
-                with open(full_path, 'rb') as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header('Content-Type', mime_type)
-                self.send_header('Content-Length', str(len(content)))
+        st = stat_regular_file(full_path)
+        if st is None:
+            self.send_error(404, "File Not Found")
+            return
+        
+        try:
+            self.send_file(full_path, st, cors=True)
+        except Exception as e:
+            logger.error(f"读取配置文件失败 {full_path}: {e}")
+            self.send_error(500, "Internal Server Error")
+    
+    def send_file(self, full_path, st, cors=False):
+        """发送文件内容，客户端缓存的ETag仍有效时返回304"""
+        size, content, mime_type, etag = get_cached_file(full_path, st)
+        
+        # 可压缩的文件按客户端支持的方式压缩，不同压缩方式使用不同的ETag
+        compressible = size >= COMPRESS_MIN_SIZE and is_compressible(mime_type)
+        encoding = negotiate_encoding(self.headers.get('Accept-Encoding', '')) if compressible else None
+        file_etag = etag
+        if encoding is not None:
+            etag = f'{etag[:-1]}-{encoding}"'
+        
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and (if_none_match.strip() == '*' or
+                              etag in (tag.strip() for tag in if_none_match.split(','))):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            if compressible:
+                self.send_header('Vary', 'Accept-Encoding')
+            if cors:
                 self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content)
-                
-            except Exception as e:
-                logger.error(f"读取配置文件失败 {full_path}: {e}")
-                self.send_error(500, "Internal Server Error")
+            self.end_headers()
+            return
+        
+        if encoding is not None:
+            content = get_compressed_file(full_path, file_etag, content, encoding)
+            size = len(content)
+        
+        self.send_response(200)
+        self.send_header('Content-Type', mime_type)
+        self.send_header('Content-Length', str(size))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        if encoding is not None:
+            self.send_header('Content-Encoding', encoding)
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        if cors:
+            self.send_header('Access-Control-Allow-Origin', '*')
+        
+        if content is not None:
+            self.end_headers_with_body(content)
         else:
-            self.send_error(404, "File Not Found")
+            self.end_headers()
+            # 大文件零拷贝发送：socket.sendfile在支持的平台上使用os.sendfile，否则退回普通send
+            self.wfile.flush()
+            with open(full_path, 'rb') as f:
+                self.connection.sendfile(f, 0, size)
     
     def handle_save_table_info(self):
         """处理保存表信息数据请求"""
@@ -298,14 +548,13 @@ class WebAPIHandler(BaseHTTPRequestHandler):
             # 读取请求体
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            # 只做JSON格式校验，校验通过后原样写入，省去重新序列化
+            json_loads(post_data)
             
             # 保存到文件
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-            file_path = os.path.join(config_dir, 'o_line_table_info.json')
+            file_path = os.path.join(CONFIG_DIR, 'o_line_table_info.json')
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write(file_path, post_data)
             
             logger.info(f"表信息数据已保存到: {file_path}")
             self.send_json_response({"success": True, "message": "表信息数据保存成功"})
@@ -320,14 +569,13 @@ class WebAPIHandler(BaseHTTPRequestHandler):
             # 读取请求体
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            # 只做JSON格式校验，校验通过后原样写入，省去重新序列化
+            json_loads(post_data)
             
             # 保存到文件
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-            file_path = os.path.join(config_dir, 'o_line_relations.json')
+            file_path = os.path.join(CONFIG_DIR, 'o_line_relations.json')
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write(file_path, post_data)
             
             logger.info(f"关系数据已保存到: {file_path}")
             self.send_json_response({"success": True, "message": "关系数据保存成功"})
@@ -336,85 +584,56 @@ class WebAPIHandler(BaseHTTPRequestHandler):
             logger.error(f"保存关系数据失败: {e}")
             self.send_error(500, f"保存失败: {str(e)}")
     
-    def handle_load_table_info(self):
+    def handle_load_table_info(self, query_params=None):
         """处理加载表信息数据请求"""
         try:
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-            file_path = os.path.join(config_dir, 'o_line_table_info.json')
+            file_path = os.path.join(CONFIG_DIR, 'o_line_table_info.json')
             
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.send_json_response(data)
-            else:
+            try:
+                with open(file_path, 'rb') as f:
+                    data = json_loads(f.read())
+            except FileNotFoundError:
                 self.send_error(404, "表信息数据文件不存在")
+                return
+            self.send_json_response(data)
                 
         except Exception as e:
             logger.error(f"加载表信息数据失败: {e}")
             self.send_error(500, f"加载失败: {str(e)}")
     
-    def handle_load_relation(self):
+    def handle_load_relation(self, query_params=None):
         """处理加载关系数据请求"""
         try:
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-            file_path = os.path.join(config_dir, 'o_line_relations.json')
+            file_path = os.path.join(CONFIG_DIR, 'o_line_relations.json')
             
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.send_json_response(data)
-            else:
+            try:
+                with open(file_path, 'rb') as f:
+                    data = json_loads(f.read())
+            except FileNotFoundError:
                 self.send_error(404, "关系数据文件不存在")
+                return
+            self.send_json_response(data)
                 
         except Exception as e:
             logger.error(f"加载关系数据失败: {e}")
             self.send_error(500, f"加载失败: {str(e)}")
     
-    def handle_merge_er_data(self):
+    def handle_merge_er_data(self, query_params=None):
         """处理合并ER数据请求"""
         try:
-            import subprocess
-            import sys
+            payload, output = run_merge()
             
-            # 获取脚本路径
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            merge_script = os.path.join(script_dir, 'merge_er_data.py')
-            
-            if not os.path.exists(merge_script):
-                self.send_error(404, "合并脚本不存在")
-                return
-            
-            # 设置环境变量确保UTF-8编码
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-            
-            # 执行合并脚本
-            result = subprocess.run([sys.executable, merge_script], 
-                                  capture_output=True, text=True, 
-                                  encoding='utf-8', errors='replace',
-                                  env=env)
-            
-            if result.returncode == 0:
-                # 读取合并后的数据
-                config_dir = os.path.join(os.path.dirname(script_dir), 'config')
-                merged_file = os.path.join(config_dir, 'merged_er_data.json')
-                
-                if os.path.exists(merged_file):
-                    with open(merged_file, 'r', encoding='utf-8') as f:
-                        merged_data = json.load(f)
-                    
-                    logger.info("ER数据合并成功")
-                    self.send_json_response({
-                        "success": True, 
-                        "message": "数据合并成功",
-                        "data": merged_data,
-                        "output": result.stdout
-                    })
-                else:
-                    self.send_error(500, "合并文件未生成")
+            if payload is not None:
+                logger.info("ER数据合并成功")
+                # 合并结果已是JSON字节，直接拼入响应体，无需读回文件再解析、序列化
+                self.send_json_body(b"".join((
+                    b'{"success":true,"message":', json_dumps("数据合并成功"),
+                    b',"data":', payload,
+                    b',"output":', json_dumps(output), b'}'
+                )))
             else:
-                logger.error(f"合并脚本执行失败: {result.stderr}")
-                self.send_error(500, f"合并失败: {result.stderr}")
+                logger.error(f"合并ER数据失败: {output}")
+                self.send_error(500, f"合并失败: {output}")
                 
         except Exception as e:
             logger.error(f"合并ER数据失败: {e}")
@@ -426,14 +645,13 @@ class WebAPIHandler(BaseHTTPRequestHandler):
             # 读取请求体
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            # 只做JSON格式校验，校验通过后原样写入，省去重新序列化
+            json_loads(post_data)
             
             # 保存到文件
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
-            file_path = os.path.join(config_dir, 'selected_tables.json')
+            file_path = os.path.join(CONFIG_DIR, 'selected_tables.json')
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            atomic_write(file_path, post_data)
             
             logger.info(f"已选表信息已保存到: {file_path}")
             self.send_json_response({"success": True, "message": "已选表信息保存成功"})
@@ -443,33 +661,103 @@ class WebAPIHandler(BaseHTTPRequestHandler):
             self.send_error(500, f"保存失败: {str(e)}")
     
     def send_json_response(self, data):
-        """发送JSON响应"""
-        self.send_response(200)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        """发送JSON响应，默认输出紧凑格式，查询参数pretty=1时输出带缩进的格式便于调试"""
+        pretty = 'pretty=1' in self.path.partition('?')[2].split('&')
+        self.send_json_body(json_dumps(data, pretty=pretty))
+    
+    def send_json_body(self, body):
+        """发送已序列化的JSON响应体，响应头由模板一次生成，不逐个调用send_header"""
+        extra_headers = b''
+        if len(body) >= COMPRESS_MIN_SIZE:
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding', ''))
+            if encoding is not None:
+                body = compress_body(body, encoding)
+                extra_headers = b'Content-Encoding: %s\r\n' % encoding.encode('ascii')
+            extra_headers += b'Vary: Accept-Encoding\r\n'
+        
+        self.log_request(200)
+        head = JSON_RESPONSE_HEAD % (self.protocol_version.encode('ascii'),
+                                     self.date_time_string().encode('ascii'), len(body), extra_headers)
+        self.send_buffers(head, body)
+    
+    def end_headers_with_body(self, body):
+        """结束响应头，并与响应体一起发送，避免响应头和响应体分别写socket"""
+        headers_buffer = getattr(self, '_headers_buffer', [])
+        if self.request_version != 'HTTP/0.9':
+            headers_buffer.append(b"\r\n")
+        self._headers_buffer = []
+        self.send_buffers(b"".join(headers_buffer), body)
+    
+    def send_buffers(self, *buffers):
+        """通过一次sendmsg系统调用发送多个缓冲区，部分发送时继续发送剩余数据"""
+        if not hasattr(self.connection, 'sendmsg'):
+            self.wfile.write(b"".join(buffers))
+            return
         
-        response = json.dumps(data, ensure_ascii=False, indent=2)
-        self.wfile.write(response.encode('utf-8'))
+        views = [memoryview(buf) for buf in buffers if buf]
+        while views:
+            sent = self.connection.sendmsg(views)
+            while views and sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            if sent:
+                views[0] = views[0][sent:]
+    
+    # CORS预检响应内容固定，类加载时生成一次
+    _OPTIONS_RESPONSE = (
+        protocol_version.encode('ascii') + b' 200 OK\r\n'
+        b'Access-Control-Allow-Origin: *\r\n'
+        b'Access-Control-Allow-Methods: GET, POST, DELETE, OPTIONS\r\n'
+        b'Access-Control-Allow-Headers: Content-Type\r\n'
+        b'Content-Length: 0\r\n'
+        b'\r\n'
+    )
     
     def do_OPTIONS(self):
         """处理OPTIONS请求（CORS预检）"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self.log_request(200)
+        self.wfile.write(self._OPTIONS_RESPONSE)
     
     def log_message(self, format, *args):
         """自定义日志格式"""
         logger.info(f"{self.address_string()} - {format % args}")
+    
+    # 路由表：精确路径直接查字典，带前缀的路径先用正则取出前缀再查字典
+    _PREFIX_RE = re.compile(r'/(?:api/data|html|config)/')
+    
+    _GET_ROUTES = {
+        '/api/data': handle_get_data,
+        '/api/stats': handle_get_stats,
+        '/api/load-table-info': handle_load_table_info,
+        '/api/load-relation': handle_load_relation,
+        '/api/merge-er-data': handle_merge_er_data,
+    }
+    _GET_PREFIX_ROUTES = {
+        '/api/data/': handle_get_specific_data,
+        '/html/': handle_static_file,
+        '/config/': handle_config_file,
+    }
+    
+    _POST_ROUTES = {
+        '/api/data': handle_post_data,
+        '/api/save-table-info': handle_save_table_info,
+        '/api/save-relation': handle_save_relation,
+        '/api/save-selected-tables': handle_save_selected_tables,
+    }
+    _POST_PREFIX_ROUTES = {
+        '/api/data/': handle_post_specific_data,
+    }
+    
+    _DELETE_PREFIX_ROUTES = {
+        '/api/data/': handle_delete_data,
+    }
 
 def start_server(host='localhost', port=8080):
     """启动Web服务器"""
     server_address = (host, port)
-    httpd = HTTPServer(server_address, WebAPIHandler)
+    WebAPIHandler.data_handler = DataHandler()
+    warm_file_cache(HTML_DIR, CONFIG_DIR)
+    # 每个连接由独立线程处理，文件读写、合并等慢请求不会阻塞其他请求
+    httpd = ThreadingHTTPServer(server_address, WebAPIHandler)
     
     logger.info(f"Web服务器启动在 http://{host}:{port}")
     logger.info("API端点:")
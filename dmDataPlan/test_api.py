@@ -7,6 +7,9 @@
 import requests
 import json
 
+# 复用同一会话，多个请求共享keep-alive连接
+SESSION = requests.Session()
+
 def test_save_selected_tables():
     """测试保存已选表API"""
     try:
@@ -37,7 +40,7 @@ def test_save_selected_tables():
         print("测试数据:", json.dumps(test_data, indent=2, ensure_ascii=False))
         
         # 发送POST请求
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:8080/api/save-selected-tables',
             json=test_data,
             headers={'Content-Type': 'application/json'},
@@ -69,7 +72,7 @@ def test_get_selected_tables():
     """测试获取已选表API"""
     try:
         print("\n正在测试获取API...")
-        response = requests.get('http://localhost:8080/api/data?file=selected_tables.json', timeout=10)
+        response = SESSION.get('http://localhost:8080/api/data?file=selected_tables.json', timeout=10)
         
         print(f"响应状态码: {response.status_code}")
         if response.status_code == 200:
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试CRUD数据文件加载、修改后再保存，其余内容保持不变
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, 'python'))
+
+SAMPLE_THEMES = [
+    {
+        "code": "CUSTOMER",
+        "owner": "张三",
+        "name": "客户主题",
+        "description": None,
+        "status": "active",
+        "id": 1,
+        "createTime": "2025-01-01 10:00:00",
+        "updateTime": "2025-01-01 10:00:00",
+        "tags": ["core"]
+    }
+]
+
+def test_load_save_roundtrip():
+    """测试加载后通过update保存：显式null、未知字段及键顺序保持不变"""
+    cwd = os.getcwd()
+    # 在临时目录中运行，数据文件和日志文件不写入仓库，结束后恢复工作目录
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            return _check_roundtrip()
+        finally:
+            os.chdir(cwd)
+
+def _check_roundtrip():
+    import crud_operations
+    
+    os.makedirs('data', exist_ok=True)
+    with open('data/themes.json', 'w', encoding='utf-8') as f:
+        json.dump(SAMPLE_THEMES, f, ensure_ascii=False, indent=2)
+    
+    manager = crud_operations.ThemeManager()
+    updated = manager.update(1, {"status": "inactive"})
+    with open('data/themes.json', 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    
+    expected = dict(SAMPLE_THEMES[0], status="inactive", updateTime=saved[0]['updateTime'])
+    checks = [
+        ("update返回更新后的数据", updated == expected),
+        ("保存后其余字段不变", saved == [expected]),
+        ("保存后键顺序不变", list(saved[0]) == list(SAMPLE_THEMES[0])),
+        ("get_all返回可序列化的字典", json.loads(json.dumps(manager.get_all(), ensure_ascii=False)) == [expected]),
+        ("get_by_id保留显式null", manager.get_by_id(1)['description'] is None),
+    ]
+    for label, ok in checks:
+        print(f"{'✅' if ok else '❌'} {label}")
+    return all(ok for _, ok in checks)
+
+if __name__ == "__main__":
+    sys.exit(0 if test_load_save_roundtrip() else 1)
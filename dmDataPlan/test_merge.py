@@ -4,40 +4,42 @@
 测试合并脚本的编码问题
 """
 
-import subprocess
+import logging
 import sys
 import os
+import time
+import traceback
 
-def test_merge_script():
-    """测试合并脚本"""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    merge_script = os.path.join(script_dir, 'python', 'merge_er_data.py')
-    
-    print(f"测试脚本: {merge_script}")
-    print(f"脚本存在: {os.path.exists(merge_script)}")
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, 'python'))
+
+import merge_er_data
+
+def test_merge_script(repeat=1):
+    """测试合并脚本：进程内直接调用合并函数，并输出每次调用耗时"""
+    print(f"测试脚本: {merge_er_data.__file__}")
     
-    # 设置环境变量确保UTF-8编码
-    env = os.environ.copy()
-    env['PYTHONIOENCODING'] = 'utf-8'
+    # 合并日志输出到stdout，便于检查中文输出
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    paths = merge_er_data.CONFIG_PATHS
     
     try:
-        # 执行合并脚本
-        result = subprocess.run([sys.executable, merge_script], 
-                              capture_output=True, text=True, 
-                              encoding='utf-8', errors='replace',
-                              env=env)
-        
-        print(f"返回码: {result.returncode}")
-        print(f"标准输出: {result.stdout}")
-        print(f"标准错误: {result.stderr}")
-        
-        if result.returncode == 0:
-            print("✅ 合并脚本执行成功!")
-        else:
-            print("❌ 合并脚本执行失败!")
+        for i in range(repeat):
+            start = time.perf_counter_ns()
+            success = merge_er_data.merge_er_data(paths['selected_tables'], paths['relations'],
+                                                  paths['table_metadata'], paths['output'])
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            print(f"第{i + 1}次合并耗时: {elapsed_ms:.3f} ms")
             
-    except Exception as e:
-        print(f"执行异常: {e}")
+            if success:
+                print("✅ 合并脚本执行成功!")
+            else:
+                print("❌ 合并脚本执行失败!")
+                break
+        
+    except Exception:
+        print("执行异常:")
+        traceback.print_exc()
 
 if __name__ == "__main__":
-    test_merge_script()
+    test_merge_script(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
@@ -9,6 +9,11 @@ import os
 import sys
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # 未安装时使用标准库json
+    orjson = None
+
 def update_selected_tables(selected_tables_data):
     """更新selected_tables.json文件"""
     try:
@@ -29,9 +34,13 @@ def update_selected_tables(selected_tables_data):
             "last_updated": datetime.now().isoformat() + "Z"
         }
         
-        # 写入文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # 先整体序列化，再一次写入文件
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        with open(file_path, 'wb') as f:
+            f.write(payload)
         
         print(f"✅ 已选表信息已更新到: {file_path}")
         print(f"📊 包含 {len(data['selectedTableNames'])} 个已选表")
@@ -50,7 +59,8 @@ def main():
     
     try:
         # 解析命令行参数
-        json_data = json.loads(sys.argv[1])
+        raw = sys.argv[1].encode('utf-8', 'surrogateescape')
+        json_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         success = update_selected_tables(json_data)
         
         if success:
@@ -1,16 +1,66 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from anyio import to_thread
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import uvicorn
+import asyncio
 import os
 import json
-import subprocess
 import sys
-from typing import Dict, Any, List
+import tempfile
+import threading
+from typing import Dict, Any, List, Tuple
+
+try:
+	import orjson
+except ImportError:  # 未安装时使用标准库json
+	orjson = None
+
+try:
+	import uvloop
+except ImportError:  # 未安装时退回asyncio默认事件循环
+	uvloop = None
+
+try:
+	import httptools
+except ImportError:  # 未安装时退回h11解析器
+	httptools = None
 
 CONFIG_DIR = "/workspace/dmDataPlan/config"
+MERGE_SCRIPT_DIR = "/workspace/dmDataPlan/python"
+
+# uvicorn worker进程数，可用WEB_CONCURRENCY覆盖
+WORKERS = int(os.environ.get("WEB_CONCURRENCY", "0")) or max(2, os.cpu_count() or 1)
+# 仅单进程时PUT/PATCH先确认再后台落盘；多worker时各进程的待写入互不可见，改为同步写入。
+# WORKERS默认至少为2，因此延迟落盘默认关闭，需设置WEB_CONCURRENCY=1才会启用
+DEFER_WRITES = WORKERS == 1
+
+# 直接导入合并逻辑在进程内调用，避免每次请求启动新的Python解释器
+sys.path.insert(0, MERGE_SCRIPT_DIR)
+try:
+	from merge_er_data import merge_er_payload
+except ImportError:  # 合并脚本不存在时接口返回404
+	merge_er_payload = None
+
+# 同步路由(anyio线程池)与asyncio.to_thread文件读写共用的线程数上限
+THREAD_POOL_SIZE = min(4 * (os.cpu_count() or 1), 128)
 
-app = FastAPI(title="Config JSON CRUD API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+	to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+	executor = ThreadPoolExecutor(THREAD_POOL_SIZE, "file-io")
+	asyncio.get_running_loop().set_default_executor(executor)
+	yield
+	executor.shutdown(wait=True)
+
+# orjson可用时所有接口都用orjson序列化响应
+app = FastAPI(title="Config JSON CRUD API", lifespan=lifespan,
+	default_response_class=ORJSONResponse if orjson is not None else JSONResponse)
 
 app.add_middleware(
 	CORSMiddleware,
@@ -20,93 +70,227 @@ app.add_middleware(
 	allow_headers=["*"],
 )
 
+# JSON文本压缩率高，超过1KB的响应按Accept-Encoding做gzip压缩
+GZIP_MIN_SIZE = 1024
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_SIZE, compresslevel=4)
+
 os.makedirs(CONFIG_DIR, exist_ok=True)
 
+# 配置文件按静态文件直接提供(sendfile + ETag/304)，只读客户端可绕过路由处理。
+# 尚未落盘的PUT/PATCH在此不可见，需要读到最新写入时使用/config/{name}
+app.mount("/files", StaticFiles(directory=CONFIG_DIR), name="files")
+
 class Item(BaseModel):
 	data: Dict[str, Any]
 
 # Helper functions
 
-def read_json_file(path: str) -> Any:
-	if not os.path.exists(path):
+# 已解析的配置缓存: 路径 -> (st_mtime_ns, st_size, 解析结果)，文件未变化时直接复用
+_JSON_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+# 已确认但尚未落盘的写入: 路径 -> (序列化结果, 解析结果)，由后台任务写入文件。
+# 落盘前读取以此为准；落盘失败时丢弃该写入，进程崩溃会丢失尚未落盘的写入
+_PENDING_WRITES: Dict[str, Tuple[bytes, Any]] = {}
+_FLUSH_LOCK = threading.Lock()
+# 保护_PENDING_WRITES的登记与比较删除，只在修改字典时持有，不跨越文件IO
+_PENDING_LOCK = threading.Lock()
+
+# 已确认存在的目录，每个目录每个进程只makedirs一次；CONFIG_DIR已在启动时创建
+_ENSURED_DIRS = {CONFIG_DIR}
+
+def json_loads(raw: bytes) -> Any:
+	return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def _read_json_sync(path: str) -> Any:
+	pending = _PENDING_WRITES.get(path)
+	if pending is not None:
+		return pending[1]
+	try:
+		st = os.stat(path)
+	except FileNotFoundError:
 		return None
-	with open(path, "r", encoding="utf-8") as f:
-		return json.load(f)
+	hit = _JSON_CACHE.get(path)
+	if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+		return hit[2]
+	with open(path, "rb") as f:
+		raw = f.read()
+	data = json_loads(raw)
+	_JSON_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+	return data
+
+def atomic_write(path: str, payload: bytes) -> None:
+	"""先写同目录临时文件再os.replace替换，中途失败不会留下写了一半的配置"""
+	fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+	try:
+		with os.fdopen(fd, "wb") as f:
+			f.write(payload)
+		os.chmod(tmp_path, 0o644)
+		os.replace(tmp_path, path)
+	except BaseException:
+		os.unlink(tmp_path)
+		raise
+
+def dump_json(data: Any) -> bytes:
+	if orjson is not None:
+		return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+	return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _write_raw_sync(path: str, payload: bytes) -> None:
+	dir_path = os.path.dirname(path)
+	if dir_path not in _ENSURED_DIRS:
+		os.makedirs(dir_path, exist_ok=True)
+		_ENSURED_DIRS.add(dir_path)
+	atomic_write(path, payload)
+	_JSON_CACHE.pop(path, None)
+
+def _flush_pending_sync(path: str) -> None:
+	"""
+	把该路径最新的待写入内容落盘；较早的任务若发现已被后续任务写入则直接返回。
+	无论成功与否都移除该待写入，失败时异常继续抛出，读取回到磁盘上的内容
+	"""
+	with _FLUSH_LOCK:
+		pending = _PENDING_WRITES.get(path)
+		if pending is None:
+			return
+		try:
+			_write_raw_sync(path, pending[0])
+		finally:
+			# 比较与删除须在同一把锁内完成，否则可能删掉落盘期间新登记的写入
+			with _PENDING_LOCK:
+				if _PENDING_WRITES.get(path) is pending:
+					del _PENDING_WRITES[path]
 
-def write_json_file(path: str, data: Any) -> None:
-	os.makedirs(os.path.dirname(path), exist_ok=True)
-	with open(path, "w", encoding="utf-8") as f:
-		json.dump(data, f, ensure_ascii=False, indent=2)
+def _delete_sync(path: str) -> bool:
+	with _FLUSH_LOCK:
+		with _PENDING_LOCK:
+			pending = _PENDING_WRITES.pop(path, None)
+		_JSON_CACHE.pop(path, None)
+		try:
+			os.remove(path)
+		except FileNotFoundError:
+			return pending is not None
+		return True
+
+# 文件读写放到线程池执行，不阻塞事件循环
+async def read_json_file(path: str) -> Any:
+	return await asyncio.to_thread(_read_json_sync, path)
+
+async def write_raw_file(path: str, payload: bytes) -> None:
+	await asyncio.to_thread(_write_raw_sync, path, payload)
+
+async def flush_pending(path: str) -> None:
+	"""后台落盘任务：响应已发出，失败时只能记录错误"""
+	try:
+		await asyncio.to_thread(_flush_pending_sync, path)
+	except Exception as e:
+		print(f"Background write error for {path}: {e}")
+
+async def schedule_write(path: str, payload: bytes, data: Any, background_tasks: BackgroundTasks) -> None:
+	"""登记待写入内容；DEFER_WRITES时在响应发出后由后台任务落盘，否则立即落盘"""
+	with _PENDING_LOCK:
+		_PENDING_WRITES[path] = (payload, data)
+	if DEFER_WRITES:
+		background_tasks.add_task(flush_pending, path)
+		return
+	try:
+		await asyncio.to_thread(_flush_pending_sync, path)
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=f"Write error: {str(e)}")
+
+async def read_json_body(request: Request) -> Tuple[bytes, Any]:
+	"""读取原始请求体并做JSON校验，绕过FastAPI/Pydantic的请求体解析"""
+	raw = await request.body()
+	try:
+		return raw, json_loads(raw)
+	except ValueError:
+		raise HTTPException(status_code=400, detail="Invalid JSON body")
+
+async def json_file_response(path: str, request: Request, not_found: str) -> Response:
+	"""直接以文件内容作为响应体(sendfile)，并按ETag返回304，省去解析与重新序列化"""
+	pending = _PENDING_WRITES.get(path)
+	if pending is not None:
+		return Response(content=pending[0], media_type="application/json")
+	try:
+		st = await asyncio.to_thread(os.stat, path)
+	except FileNotFoundError:
+		raise HTTPException(status_code=404, detail=not_found)
+	etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+	# 与GZipMiddleware的压缩条件一致：会被gzip压缩的响应使用不同的ETag，避免不同编码间误判304
+	if st.st_size >= GZIP_MIN_SIZE and "gzip" in request.headers.get("accept-encoding", ""):
+		etag = f'{etag[:-1]}-gzip"'
+	if_none_match = request.headers.get("if-none-match")
+	if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+		return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+	return FileResponse(path, media_type="application/json", headers={"ETag": etag}, stat_result=st)
 
 # List all config files
 @app.get("/config/files")
 def list_files() -> List[str]:
-	files = []
-	for entry in os.listdir(CONFIG_DIR):
-		if entry.endswith(".json"):
-			files.append(entry)
-	return files
+	# scandir的目录项自带文件类型，过滤时无需额外stat
+	with os.scandir(CONFIG_DIR) as it:
+		return [entry.name for entry in it if entry.name.endswith(".json") and entry.is_file()]
 
 # Read a specific config file
 @app.get("/config/{name}")
-def read_config(name: str) -> Any:
+async def read_config(name: str, request: Request) -> Response:
 	if not name.endswith(".json"):
 		name = f"{name}.json"
 	path = os.path.join(CONFIG_DIR, name)
-	data = read_json_file(path)
-	if data is None:
-		raise HTTPException(status_code=404, detail="Config not found")
-	return data
+	return await json_file_response(path, request, "Config not found")
 
 # Create a new config file (fails if exists)
 @app.post("/config/{name}")
-def create_config(name: str, body: Any) -> Dict[str, Any]:
+async def create_config(name: str, request: Request) -> Dict[str, Any]:
 	if not name.endswith(".json"):
 		name = f"{name}.json"
 	path = os.path.join(CONFIG_DIR, name)
-	if os.path.exists(path):
+	if path in _PENDING_WRITES or await asyncio.to_thread(os.path.exists, path):
 		raise HTTPException(status_code=409, detail="Config already exists")
-	write_json_file(path, body)
+	# 校验通过后原样写入请求体，省去重新序列化
+	raw, _ = await read_json_body(request)
+	await write_raw_file(path, raw)
 	return {"ok": True, "name": name}
 
 # Update/replace a config file (creates if not exists)
 @app.put("/config/{name}")
-def upsert_config(name: str, body: Any) -> Dict[str, Any]:
+async def upsert_config(name: str, request: Request, background_tasks: BackgroundTasks) -> Dict[str, Any]:
 	if not name.endswith(".json"):
 		name = f"{name}.json"
 	path = os.path.join(CONFIG_DIR, name)
-	write_json_file(path, body)
+	raw, data = await read_json_body(request)
+	await schedule_write(path, raw, data, background_tasks)
 	return {"ok": True, "name": name}
 
 # Patch: read-modify-write merging dicts
 @app.patch("/config/{name}")
-def patch_config(name: str, body: Dict[str, Any]) -> Any:
+async def patch_config(name: str, request: Request, background_tasks: BackgroundTasks) -> Any:
 	if not name.endswith(".json"):
 		name = f"{name}.json"
 	path = os.path.join(CONFIG_DIR, name)
-	data = read_json_file(path)
+	_, body = await read_json_body(request)
+	data = await read_json_file(path)
 	if data is None:
 		raise HTTPException(status_code=404, detail="Config not found")
 	if isinstance(data, dict) and isinstance(body, dict):
-		data.update(body)
-		write_json_file(path, data)
+		# 缓存中的对象可能被其他请求共享，合并到副本上
+		data = {**data, **body}
+		await schedule_write(path, dump_json(data), data, background_tasks)
 		return data
 	raise HTTPException(status_code=400, detail="Only dict patch supported")
 
 # Delete a config file
 @app.delete("/config/{name}")
-def delete_config(name: str) -> Dict[str, Any]:
+async def delete_config(name: str) -> Dict[str, Any]:
 	if not name.endswith(".json"):
 		name = f"{name}.json"
 	path = os.path.join(CONFIG_DIR, name)
-	if not os.path.exists(path):
+	if not await asyncio.to_thread(_delete_sync, path):
 		raise HTTPException(status_code=404, detail="Config not found")
-	os.remove(path)
 	return {"ok": True}
 
 # Merge ER data API endpoint
 @app.get("/api/merge-er-data")
-def merge_er_data() -> Dict[str, Any]:
+def merge_er_data() -> Response:
 	"""合并selected_tables.json和o_line_relations.json数据"""
 	try:
 		# 定义文件路径
@@ -115,6 +299,13 @@ def merge_er_data() -> Dict[str, Any]:
 		table_metadata_path = os.path.join(CONFIG_DIR, 'table_metadata.json')
 		output_path = os.path.join(CONFIG_DIR, 'merged_er_data.json')
 		
+		# 先落盘输入及输出文件的待写入，合并读取的是已确认的最新内容
+		for path in (selected_tables_path, relations_path, table_metadata_path, output_path):
+			try:
+				_flush_pending_sync(path)
+			except Exception as e:
+				raise HTTPException(status_code=500, detail=f"Write error: {str(e)}")
+		
 		# 检查必需文件是否存在
 		if not os.path.exists(selected_tables_path):
 			raise HTTPException(status_code=404, detail="selected_tables.json not found")
@@ -123,33 +314,20 @@ def merge_er_data() -> Dict[str, Any]:
 		if not os.path.exists(table_metadata_path):
 			raise HTTPException(status_code=404, detail="table_metadata.json not found")
 		
-		# 执行合并脚本
-		merge_script_path = "/workspace/dmDataPlan/python/merge_er_data.py"
-		if not os.path.exists(merge_script_path):
+		if merge_er_payload is None:
 			raise HTTPException(status_code=404, detail="merge script not found")
 		
-		# 运行Python脚本
-		result = subprocess.run([
-			sys.executable, merge_script_path
-		], capture_output=True, text=True, cwd="/workspace")
-		
-		if result.returncode != 0:
-			print(f"Merge script error: {result.stderr}")
-			raise HTTPException(status_code=500, detail=f"Merge failed: {result.stderr}")
-		
-		# 读取合并后的数据
-		if not os.path.exists(output_path):
-			raise HTTPException(status_code=500, detail="Merged data file not created")
+		# 进程内执行合并，返回值即写入输出文件的JSON字节
+		payload = merge_er_payload(selected_tables_path, relations_path, table_metadata_path, output_path)
+		if payload is None:
+			raise HTTPException(status_code=500, detail="Merge failed")
 		
-		merged_data = read_json_file(output_path)
-		if merged_data is None:
-			raise HTTPException(status_code=500, detail="Failed to read merged data")
-		
-		return {
-			"success": True,
-			"message": "数据合并成功",
-			"data": merged_data
-		}
+		# 合并结果直接拼入响应体，无需重新读取输出文件再序列化
+		body = b"".join((
+			b'{"success":true,"message":', '"数据合并成功"'.encode("utf-8"),
+			b',"data":', payload, b'}'
+		))
+		return Response(content=body, media_type="application/json")
 		
 	except HTTPException:
 		raise
@@ -159,16 +337,13 @@ def merge_er_data() -> Dict[str, Any]:
 
 # Data file API endpoint
 @app.get("/api/data")
-def get_data_file(file: str = "merged_er_data.json") -> Dict[str, Any]:
+async def get_data_file(request: Request, file: str = "merged_er_data.json") -> Response:
 	"""获取指定的数据文件"""
 	try:
 		if not file.endswith(".json"):
 			file = f"{file}.json"
 		path = os.path.join(CONFIG_DIR, file)
-		data = read_json_file(path)
-		if data is None:
-			raise HTTPException(status_code=404, detail="Data file not found")
-		return data
+		return await json_file_response(path, request, "Data file not found")
 	except HTTPException:
 		raise
 	except Exception as e:
@@ -176,4 +351,8 @@ def get_data_file(file: str = "merged_er_data.json") -> Dict[str, Any]:
 		raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 if __name__ == "__main__":
-	uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+	# 多进程并行处理请求；各worker的配置缓存按mtime校验，独立缓存不影响一致性
+	# 安装了uvicorn[standard]时显式使用uvloop事件循环与httptools解析器
+	uvicorn.run("server:app", host="0.0.0.0", port=8000, workers=WORKERS,
+		loop="uvloop" if uvloop is not None else "asyncio",
+		http="httptools" if httptools is not None else "h11")
\ No newline at end of file
@@ -2,16 +2,51 @@
 # -*- coding: utf-8 -*-
 
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse
+import gzip
 import json
 import os
+import re
+import tempfile
+
+try:
+	import orjson
+except ImportError:  # 未安装时使用标准库json
+	orjson = None
 
 HOST = '0.0.0.0'
 PORT = 8000
 CONFIG_DIR = '/workspace/config'
+# 响应体超过该字节数且客户端支持gzip时压缩
+COMPRESS_MIN_SIZE = 1024
 
 os.makedirs(CONFIG_DIR, exist_ok=True)
 
+# /config/<name> 路由，容忍多余的斜杠
+CONFIG_PATH_RE = re.compile(r'^/+config/+([^/]+)/*$')
+
+def json_loads(raw):
+	return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def json_dumps(obj, indent=False):
+	if orjson is not None:
+		return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+	if indent:
+		return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+	return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def write_json_file(path, obj):
+	"""整体序列化后写入同目录临时文件，再os.replace原子替换"""
+	payload = json_dumps(obj, indent=True)
+	fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			f.write(payload)
+		os.chmod(tmp_path, 0o644)
+		os.replace(tmp_path, path)
+	except BaseException:
+		os.unlink(tmp_path)
+		raise
+
 class JSONHandler(BaseHTTPRequestHandler):
 	def _set_headers(self, code=200, extra_headers=None):
 		self.send_response(code)
@@ -33,13 +68,23 @@ class JSONHandler(BaseHTTPRequestHandler):
 			return None
 		data = self.rfile.read(length)
 		try:
-			return json.loads(data.decode('utf-8'))
+			return json_loads(data)
 		except Exception:
 			return None
 	
 	def _write_json(self, obj, code=200):
-		self._set_headers(code)
-		self.wfile.write(json.dumps(obj, ensure_ascii=False).encode('utf-8'))
+		body = json_dumps(obj)
+		headers = {'Vary': 'Accept-Encoding'}
+		if len(body) >= COMPRESS_MIN_SIZE and 'gzip' in self.headers.get('Accept-Encoding', ''):
+			body = gzip.compress(body, compresslevel=4)
+			headers['Content-Encoding'] = 'gzip'
+		headers['Content-Length'] = str(len(body))
+		self._set_headers(code, headers)
+		self.wfile.write(body)
+	
+	def _config_name(self):
+		m = CONFIG_PATH_RE.match(self.path.partition('?')[0])
+		return m.group(1) if m else None
 	
 	def _filepath(self, name):
 		if not name.endswith('.json'):
@@ -47,67 +92,58 @@ class JSONHandler(BaseHTTPRequestHandler):
 		return os.path.join(CONFIG_DIR, name)
 	
 	def do_GET(self):
-		parsed = urlparse(self.path)
-		parts = [p for p in parsed.path.split('/') if p]
-		if parts == ['config', 'files']:
-			files = [f for f in os.listdir(CONFIG_DIR) if f.endswith('.json')]
+		name = self._config_name()
+		if name == 'files':
+			with os.scandir(CONFIG_DIR) as it:
+				files = [e.name for e in it if e.name.endswith('.json') and e.is_file()]
 			return self._write_json(files)
-		if len(parts) == 2 and parts[0] == 'config':
-			name = parts[1]
+		if name is not None:
 			path = self._filepath(name)
-			if not os.path.exists(path):
-				return self._write_json({'detail': 'Config not found'}, 404)
 			try:
-				with open(path, 'r', encoding='utf-8') as f:
-					data = json.load(f)
+				with open(path, 'rb') as f:
+					data = json_loads(f.read())
+			except FileNotFoundError:
+				return self._write_json({'detail': 'Config not found'}, 404)
 			except Exception as e:
 				return self._write_json({'detail': f'Read error: {e}'}, 500)
 			return self._write_json(data)
 		return self._write_json({'detail': 'Not found'}, 404)
 	
 	def do_POST(self):
-		parsed = urlparse(self.path)
-		parts = [p for p in parsed.path.split('/') if p]
-		if len(parts) == 2 and parts[0] == 'config':
-			name = parts[1]
+		name = self._config_name()
+		if name is not None:
 			path = self._filepath(name)
 			if os.path.exists(path):
 				return self._write_json({'detail': 'Config already exists'}, 409)
 			body = self._read_body()
 			try:
-				with open(path, 'w', encoding='utf-8') as f:
-					json.dump(body, f, ensure_ascii=False, indent=2)
+				write_json_file(path, body)
 			except Exception as e:
 				return self._write_json({'detail': f'Write error: {e}'}, 500)
 			return self._write_json({'ok': True, 'name': os.path.basename(path)}, 201)
 		return self._write_json({'detail': 'Not found'}, 404)
 	
 	def do_PUT(self):
-		parsed = urlparse(self.path)
-		parts = [p for p in parsed.path.split('/') if p]
-		if len(parts) == 2 and parts[0] == 'config':
-			name = parts[1]
+		name = self._config_name()
+		if name is not None:
 			path = self._filepath(name)
 			body = self._read_body()
 			try:
-				with open(path, 'w', encoding='utf-8') as f:
-					json.dump(body, f, ensure_ascii=False, indent=2)
+				write_json_file(path, body)
 			except Exception as e:
 				return self._write_json({'detail': f'Write error: {e}'}, 500)
 			return self._write_json({'ok': True, 'name': os.path.basename(path)})
 		return self._write_json({'detail': 'Not found'}, 404)
 	
 	def do_PATCH(self):
-		parsed = urlparse(self.path)
-		parts = [p for p in parsed.path.split('/') if p]
-		if len(parts) == 2 and parts[0] == 'config':
-			name = parts[1]
+		name = self._config_name()
+		if name is not None:
 			path = self._filepath(name)
-			if not os.path.exists(path):
-				return self._write_json({'detail': 'Config not found'}, 404)
 			try:
-				with open(path, 'r', encoding='utf-8') as f:
-					data = json.load(f)
+				with open(path, 'rb') as f:
+					data = json_loads(f.read())
+			except FileNotFoundError:
+				return self._write_json({'detail': 'Config not found'}, 404)
 			except Exception as e:
 				return self._write_json({'detail': f'Read error: {e}'}, 500)
 			patch = self._read_body() or {}
@@ -115,23 +151,20 @@ class JSONHandler(BaseHTTPRequestHandler):
 				return self._write_json({'detail': 'Only dict patch supported'}, 400)
 			data.update(patch)
 			try:
-				with open(path, 'w', encoding='utf-8') as f:
-					json.dump(data, f, ensure_ascii=False, indent=2)
+				write_json_file(path, data)
 			except Exception as e:
 				return self._write_json({'detail': f'Write error: {e}'}, 500)
 			return self._write_json(data)
 		return self._write_json({'detail': 'Not found'}, 404)
 	
 	def do_DELETE(self):
-		parsed = urlparse(self.path)
-		parts = [p for p in parsed.path.split('/') if p]
-		if len(parts) == 2 and parts[0] == 'config':
-			name = parts[1]
+		name = self._config_name()
+		if name is not None:
 			path = self._filepath(name)
-			if not os.path.exists(path):
-				return self._write_json({'detail': 'Config not found'}, 404)
 			try:
 				os.remove(path)
+			except FileNotFoundError:
+				return self._write_json({'detail': 'Config not found'}, 404)
 			except Exception as e:
 				return self._write_json({'detail': f'Delete error: {e}'}, 500)
 			return self._write_json({'ok': True})